@@ -126,19 +126,31 @@ a = Analysis(
         'rapidocr.cal_rec_boxes.main',
         'rapidocr.ch_ppocr_rec.utils',
         'rapidocr.utils',
+        'rapidocr.inference_engine.onnxruntime',
+        'rapidocr.inference_engine.openvino',
         # ONNX Runtime
         'onnxruntime',
         'onnxruntime.capi',
         'onnxruntime.capi.onnxruntime_pybind11_state',
+        # OpenVINO (preferred engine on x86 when installed)
+        'openvino',
         # FastAPI & dependencies
         'fastapi',
         'fastapi.responses',
+        'orjson',
+        'psutil',
         'uvicorn',
         'uvicorn.protocols',
         'uvicorn.protocols.http',
         'uvicorn.protocols.websockets',
         'uvicorn.lifespan',
         'uvicorn.lifespan.on',
+        'uvicorn.loops',
+        'uvicorn.loops.auto',
+        'uvicorn.loops.uvloop',
+        # libuv event loops (uvloop on macOS/Linux, winloop on Windows)
+        'uvloop',
+        'winloop',
         'starlette',
         'starlette.responses',
         'starlette.middleware',
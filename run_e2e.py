@@ -6,13 +6,83 @@ End-to-end OCR pipeline for MapleStory inventory
 3. Save results and timing information
 """
 
+import os
 import time
-import json
 import shutil
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
 from datetime import datetime
-from extract_inventory_final import extract_inventory_region
-from detect_numbers_roi import detect_numbers_in_image_roi
+import orjson
+
+# ProcessPoolExecutor rejects more than 61 workers on Windows
+MAX_WORKERS = min(os.cpu_count() or 1, 61)
+
+# Parallelism comes from the worker processes, so keep OpenMP/BLAS pools to one thread each
+SINGLE_THREAD_ENV = {
+    "OMP_NUM_THREADS": "1",
+    "MKL_NUM_THREADS": "1",
+    "OPENBLAS_NUM_THREADS": "1",
+}
+
+
+def init_worker():
+    """Process pool initializer - runs before the worker imports the OpenCV/RapidOCR pipeline"""
+    os.environ.update(SINGLE_THREAD_ENV)
+
+
+def link_or_copy(src, dst):
+    """Hard-link src to dst, falling back to a copy (e.g. across filesystems)"""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy(src, dst)
+
+
+def extract_one(img_path, output_dir):
+    """Stage 1 worker: extract the inventory region of a single screenshot"""
+    # Imported here so it loads after init_worker has limited the thread pools
+    from extract_inventory_final import extract_inventory_region
+
+    img_name = img_path.stem
+    extract_start = time.time()
+
+    # Results of earlier runs are hard links to this file, so write a fresh one
+    (output_dir / f"{img_name}_5_threshold_1.png").unlink(missing_ok=True)
+
+    try:
+        bbox, num_candidates = extract_inventory_region(
+            str(img_path),
+            output_dir=output_dir,
+            debug=False
+        )
+        return img_name, bbox, time.time() - extract_start, None
+
+    except Exception as e:
+        return img_name, None, time.time() - extract_start, str(e)
+
+
+def detect_one(img_path, template_dir):
+    """Stage 2: detect the numbers in a single cropped inventory image"""
+    from detect_numbers_roi import detect_numbers_in_image_roi
+
+    img_name = img_path.stem.replace('_5_threshold_1', '')
+    detect_start = time.time()
+
+    # Results of earlier runs are hard links to this file, so write a fresh one
+    (img_path.parent / f"{img_path.stem}_detected_roi.png").unlink(missing_ok=True)
+
+    try:
+        detections, grid_results = detect_numbers_in_image_roi(
+            str(img_path),
+            template_dir,
+            threshold=0.6,
+            debug=True  # Enable visualization
+        )
+        return img_name, len(detections), grid_results, time.time() - detect_start, None
+
+    except Exception as e:
+        return img_name, 0, {}, time.time() - detect_start, str(e)
 
 
 def run_e2e_pipeline():
@@ -64,49 +134,39 @@ def run_e2e_pipeline():
 
     extraction_results = {}
 
-    for img_path in images:
-        img_name = img_path.stem
+    # Images are independent, so fan them out over all cores (map keeps input order)
+    with ProcessPoolExecutor(max_workers=MAX_WORKERS, initializer=init_worker) as executor:
+        extracted = list(executor.map(partial(extract_one, output_dir=output_dir), images))
+
+    for img_name, bbox, extract_time, error in extracted:
         print(f"\n[1/2] {img_name}")
 
-        extract_start = time.time()
-
-        try:
-            bbox, num_candidates = extract_inventory_region(
-                str(img_path),
-                output_dir=output_dir,
-                debug=False
-            )
-
-            extract_time = time.time() - extract_start
-
-            if bbox:
-                left, top, right, bottom = bbox
-                width, height = right - left + 1, bottom - top + 1
-                print(f"  ✅ Extracted: ({left},{top}) to ({right},{bottom}) {width}x{height} [{extract_time:.3f}s]")
-
-                # Copy cropped image to results
-                cropped_img = output_dir / f"{img_name}_5_threshold_1.png"
-                if cropped_img.exists():
-                    shutil.copy(cropped_img, cropped_dir / f"{img_name}.png")
-
-                extraction_results[img_name] = {
-                    'success': True,
-                    'bbox': bbox,
-                    'time': extract_time
-                }
-            else:
-                print(f"  ❌ Extraction failed [{extract_time:.3f}s]")
-                extraction_results[img_name] = {
-                    'success': False,
-                    'time': extract_time
-                }
+        if error is not None:
+            print(f"  ❌ Error: {error} [{extract_time:.3f}s]")
+            extraction_results[img_name] = {
+                'success': False,
+                'error': error,
+                'time': extract_time
+            }
+        elif bbox:
+            left, top, right, bottom = bbox
+            width, height = right - left + 1, bottom - top + 1
+            print(f"  ✅ Extracted: ({left},{top}) to ({right},{bottom}) {width}x{height} [{extract_time:.3f}s]")
+
+            # Copy cropped image to results
+            cropped_img = output_dir / f"{img_name}_5_threshold_1.png"
+            if cropped_img.exists():
+                link_or_copy(cropped_img, cropped_dir / f"{img_name}.png")
 
-        except Exception as e:
-            extract_time = time.time() - extract_start
-            print(f"  ❌ Error: {e} [{extract_time:.3f}s]")
+            extraction_results[img_name] = {
+                'success': True,
+                'bbox': bbox,
+                'time': extract_time
+            }
+        else:
+            print(f"  ❌ Extraction failed [{extract_time:.3f}s]")
             extraction_results[img_name] = {
                 'success': False,
-                'error': str(e),
                 'time': extract_time
             }
 
@@ -125,34 +185,17 @@ def run_e2e_pipeline():
     # Get all threshold_1 images created in stage 1
     threshold_images = sorted(output_dir.glob("*_5_threshold_1.png"))
 
-    for img_path in threshold_images:
-        img_name = img_path.stem.replace('_5_threshold_1', '')
-        print(f"\n[2/2] {img_name}")
+    # Detection stays serial and in-process: detect_numbers_in_image_roi builds a RapidOCR per call
+    # whose ONNX Runtime session already uses every physical core (OMP_NUM_THREADS does not reach it)
+    detected = [detect_one(img_path, template_dir) for img_path in threshold_images]
 
-        detect_start = time.time()
-
-        try:
-            detections, grid_results = detect_numbers_in_image_roi(
-                str(img_path),
-                template_dir,
-                threshold=0.6,
-                debug=True  # Enable visualization
-            )
-
-            detect_time = time.time() - detect_start
-
-            print(f"  ✅ Detected {len(detections)} digits [{detect_time:.3f}s]")
-            print(f"     Row 1: [shift:{grid_results.get('shift', '---'):>6s}] [ins:{grid_results.get('ins', '---'):>6s}] [home:{grid_results.get('home', '---'):>6s}] [pup:{grid_results.get('pup', '---'):>6s}]")
-            print(f"     Row 2: [ctrl:{grid_results.get('ctrl', '---'):>6s}] [del:{grid_results.get('del', '---'):>6s}] [end:{grid_results.get('end', '---'):>6s}] [pdn:{grid_results.get('pdn', '---'):>6s}]")
+    for img_path, (img_name, num_detections, grid_results, detect_time, error) in zip(threshold_images, detected):
+        print(f"\n[2/2] {img_name}")
 
-            # Copy detected image to results
-            # Note: img_name is already without _5_threshold_1 suffix
-            detected_img = img_path.parent / f"{img_path.stem}_detected_roi.png"
-            if detected_img.exists():
-                shutil.copy(detected_img, detected_dir / f"{img_name}.png")
+        extraction_info = extraction_results.get(img_name, {})
 
-            # Store results
-            extraction_info = extraction_results.get(img_name, {})
+        if error is not None:
+            print(f"  ❌ Error: {error} [{detect_time:.3f}s]")
 
             all_results.append({
                 'image': img_name,
@@ -163,35 +206,41 @@ def run_e2e_pipeline():
                     'time': extraction_info.get('time', 0.0)
                 },
                 'detection': {
-                    'success': True,
-                    'num_detections': len(detections),
-                    'grid': grid_results,
+                    'success': False,
+                    'error': error,
                     'time': detect_time
                 },
                 'total_time': extraction_info.get('time', 0.0) + detect_time
             })
+            continue
 
-        except Exception as e:
-            detect_time = time.time() - detect_start
-            print(f"  ❌ Error: {e} [{detect_time:.3f}s]")
+        print(f"  ✅ Detected {num_detections} digits [{detect_time:.3f}s]")
+        print(f"     Row 1: [shift:{grid_results.get('shift', '---'):>6s}] [ins:{grid_results.get('ins', '---'):>6s}] [home:{grid_results.get('home', '---'):>6s}] [pup:{grid_results.get('pup', '---'):>6s}]")
+        print(f"     Row 2: [ctrl:{grid_results.get('ctrl', '---'):>6s}] [del:{grid_results.get('del', '---'):>6s}] [end:{grid_results.get('end', '---'):>6s}] [pdn:{grid_results.get('pdn', '---'):>6s}]")
 
-            extraction_info = extraction_results.get(img_name, {})
+        # Copy detected image to results
+        # Note: img_name is already without _5_threshold_1 suffix
+        detected_img = img_path.parent / f"{img_path.stem}_detected_roi.png"
+        if detected_img.exists():
+            link_or_copy(detected_img, detected_dir / f"{img_name}.png")
 
-            all_results.append({
-                'image': img_name,
-                'timestamp': run_timestamp,
-                'extraction': {
-                    'success': extraction_info.get('success', False),
-                    'bbox': extraction_info.get('bbox'),
-                    'time': extraction_info.get('time', 0.0)
-                },
-                'detection': {
-                    'success': False,
-                    'error': str(e),
-                    'time': detect_time
-                },
-                'total_time': extraction_info.get('time', 0.0) + detect_time
-            })
+        # Store results
+        all_results.append({
+            'image': img_name,
+            'timestamp': run_timestamp,
+            'extraction': {
+                'success': extraction_info.get('success', False),
+                'bbox': extraction_info.get('bbox'),
+                'time': extraction_info.get('time', 0.0)
+            },
+            'detection': {
+                'success': True,
+                'num_detections': num_detections,
+                'grid': grid_results,
+                'time': detect_time
+            },
+            'total_time': extraction_info.get('time', 0.0) + detect_time
+        })
 
     stage2_time = time.time() - stage2_start
 
@@ -232,44 +281,52 @@ def run_e2e_pipeline():
         'results': all_results
     }
 
-    with open(results_file, 'w', encoding='utf-8') as f:
-        json.dump(results_json, f, indent=2, ensure_ascii=False)
+    # orjson writes UTF-8 bytes directly (non-ASCII kept as-is, like ensure_ascii=False)
+    with open(results_file, 'wb') as f:
+        f.write(orjson.dumps(results_json, option=orjson.OPT_INDENT_2))
 
     print(f"\n✅ Results saved to: {results_file}")
 
     # ===== SAVE SUMMARY CSV =====
     csv_file = run_results_dir / "ocr_summary.csv"
 
+    # Header
+    rows = [
+        "image,extraction_success,detection_success,num_detections,"
+        "shift,ins,home,pup,ctrl,del,end,pdn,"
+        "extraction_time,detection_time,total_time"
+    ]
+
+    # Data rows
+    for result in all_results:
+        img = result['image']
+        ext_success = 'Y' if result['extraction']['success'] else 'N'
+        det_success = 'Y' if result['detection']['success'] else 'N'
+        num_det = result['detection'].get('num_detections', 0)
+
+        grid = result['detection'].get('grid', {})
+        shift = grid.get('shift', '')
+        ins = grid.get('ins', '')
+        home = grid.get('home', '')
+        pup = grid.get('pup', '')
+        ctrl = grid.get('ctrl', '')
+        del_ = grid.get('del', '')
+        end = grid.get('end', '')
+        pdn = grid.get('pdn', '')
+
+        ext_time = result['extraction']['time']
+        det_time = result['detection']['time']
+        total_time = result['total_time']
+
+        rows.append(
+            f"{img},{ext_success},{det_success},{num_det},"
+            f"{shift},{ins},{home},{pup},{ctrl},{del_},{end},{pdn},"
+            f"{ext_time:.3f},{det_time:.3f},{total_time:.3f}"
+        )
+
+    # Build the whole file in memory and write it in one call
     with open(csv_file, 'w', encoding='utf-8') as f:
-        # Header
-        f.write("image,extraction_success,detection_success,num_detections,")
-        f.write("shift,ins,home,pup,ctrl,del,end,pdn,")
-        f.write("extraction_time,detection_time,total_time\n")
-
-        # Data rows
-        for result in all_results:
-            img = result['image']
-            ext_success = 'Y' if result['extraction']['success'] else 'N'
-            det_success = 'Y' if result['detection']['success'] else 'N'
-            num_det = result['detection'].get('num_detections', 0)
-
-            grid = result['detection'].get('grid', {})
-            shift = grid.get('shift', '')
-            ins = grid.get('ins', '')
-            home = grid.get('home', '')
-            pup = grid.get('pup', '')
-            ctrl = grid.get('ctrl', '')
-            del_ = grid.get('del', '')
-            end = grid.get('end', '')
-            pdn = grid.get('pdn', '')
-
-            ext_time = result['extraction']['time']
-            det_time = result['detection']['time']
-            total_time = result['total_time']
-
-            f.write(f"{img},{ext_success},{det_success},{num_det},")
-            f.write(f"{shift},{ins},{home},{pup},{ctrl},{del_},{end},{pdn},")
-            f.write(f"{ext_time:.3f},{det_time:.3f},{total_time:.3f}\n")
+        f.write("\n".join(rows) + "\n")
 
     print(f"✅ Summary CSV saved to: {csv_file}")
 
@@ -323,6 +323,19 @@ if errorlevel 1 (
     exit /b 1
 )
 
+REM Quantize the rec model to INT8 (bundled next to FP32; the server runs it on ONNX Runtime, det stays on OpenVINO)
+REM onnx is only needed by the quantization tool, so it is installed here rather than in requirements
+python -c "import onnx" >nul 2>&1
+if errorlevel 1 (
+    echo [INFO] Installing onnx for model quantization...
+    %PIP_INSTALL% onnx
+)
+echo [INFO] Quantizing OCR models to INT8...
+python quantize_models.py
+if errorlevel 1 (
+    echo [WARN] Model quantization incomplete, missing models will use FP32
+)
+
 REM Clean previous builds
 echo [INFO] Cleaning previous builds...
 if exist "build" rmdir /s /q build
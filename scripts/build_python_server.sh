@@ -151,6 +151,18 @@ if [ $? -ne 0 ]; then
     exit 1
 fi
 
+# Quantize the rec model to INT8 (bundled next to FP32; the server runs it on ONNX Runtime, det stays on OpenVINO)
+# onnx is only needed by the quantization tool, so it is installed here rather than in requirements
+if ! python -c "import onnx" &> /dev/null; then
+    echo "📦 Installing onnx for model quantization..."
+    $PIP_INSTALL onnx
+fi
+echo "🗜️  Quantizing OCR models to INT8..."
+python quantize_models.py
+if [ $? -ne 0 ]; then
+    echo "⚠️  Model quantization incomplete, missing models will use FP32"
+fi
+
 # Clean previous builds
 echo "🧹 Cleaning previous builds..."
 rm -rf build dist
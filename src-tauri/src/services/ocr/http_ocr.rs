@@ -1,10 +1,19 @@
 use crate::models::ocr_result::{ExpResult, LevelResult};
 use super::template_matcher::TemplateMatcher;
+use image::codecs::jpeg::JpegEncoder;
 use image::DynamicImage;
-use serde::{Deserialize, Serialize};
-use base64::{Engine as _, engine::general_purpose};
+use serde::Deserialize;
 use regex::Regex;
-use std::sync::Arc;
+use std::sync::{Arc, OnceLock};
+
+/// JPEG quality used when uploading images to the OCR server
+const JPEG_QUALITY: u8 = 85;
+
+/// EXP pattern: "1234567[12.34%]" or "1234567[12.34]" (compiled once, reused for every frame)
+fn exp_regex() -> &'static Regex {
+    static EXP_RE: OnceLock<Regex> = OnceLock::new();
+    EXP_RE.get_or_init(|| Regex::new(r"(\d+)\[?([\d.]+)%?\]?").expect("valid EXP regex"))
+}
 
 /// HTTP OCR client that communicates with Python FastAPI server
 #[derive(Clone)]
@@ -14,11 +23,6 @@ pub struct HttpOcrClient {
     template_matcher: Option<Arc<TemplateMatcher>>,
 }
 
-#[derive(Serialize)]
-struct ImageRequest {
-    image_base64: String,
-}
-
 /// Single text box with bounding box coordinates
 #[derive(Deserialize, Clone, Debug)]
 struct TextBox {
@@ -201,25 +205,29 @@ impl HttpOcrClient {
         Ok(())
     }
 
-    /// Encode image to base64
-    fn encode_image(image: &DynamicImage) -> Result<String, String> {
+    /// Encode image to JPEG bytes (quality 85)
+    /// Much smaller than PNG, so both the upload and the server-side decode get cheaper
+    fn encode_image(image: &DynamicImage) -> Result<Vec<u8>, String> {
         let mut buffer = Vec::new();
         image
-            .write_to(&mut std::io::Cursor::new(&mut buffer), image::ImageFormat::Png)
+            .to_rgb8()
+            .write_with_encoder(JpegEncoder::new_with_quality(&mut buffer, JPEG_QUALITY))
             .map_err(|e| format!("Failed to encode image: {}", e))?;
-        Ok(general_purpose::STANDARD.encode(&buffer))
+        Ok(buffer)
     }
 
     /// Call unified OCR endpoint and get processed text
     /// Returns text after NMS filtering and left-to-right sorting
     async fn recognize_text(&self, image: &DynamicImage) -> Result<String, String> {
-        let image_base64 = Self::encode_image(image)?;
-        let url = format!("{}/ocr", self.base_url);
+        let image_bytes = Self::encode_image(image)?;
+        let url = format!("{}/ocr/raw", self.base_url);
 
+        // Send the JPEG as the raw request body (no base64/JSON wrapping)
         let response = self
             .client
             .post(&url)
-            .json(&ImageRequest { image_base64 })
+            .header(reqwest::header::CONTENT_TYPE, "image/jpeg")
+            .body(image_bytes)
             .send()
             .await
             .map_err(|e| format!("Request failed: {}", e))?;
@@ -264,10 +272,7 @@ impl HttpOcrClient {
         let cleaned = text.replace("EXP", "").replace(" ", "").replace(",", "");
 
         // Extract absolute value and percentage: "1234567[12.34%]" or "1234567[12.34]"
-        let re = Regex::new(r"(\d+)\[?([\d.]+)%?\]?")
-            .map_err(|e| format!("Regex error: {}", e))?;
-
-        let caps = re.captures(&cleaned)
+        let caps = exp_regex().captures(&cleaned)
             .ok_or_else(|| format!("Failed to parse EXP format: '{}'", text))?;
 
         let absolute = caps.get(1)
@@ -1,4 +1,5 @@
 use regex::Regex;
+use std::sync::OnceLock;
 
 /// Parsed EXP data containing both absolute and percentage values
 #[derive(Debug, Clone, PartialEq)]
@@ -76,7 +77,8 @@ pub fn parse_exp(text: &str) -> Result<ExpData, String> {
     // This gives us "8.57%" instead of "18.57%" or "57%"
 
     // First try: look for bracket + percentage (most reliable)
-    let bracketed_pct = Regex::new(r"\[(\d{1,2}\.?\d*)%").unwrap();
+    static BRACKETED_PCT: OnceLock<Regex> = OnceLock::new();
+    let bracketed_pct = BRACKETED_PCT.get_or_init(|| Regex::new(r"\[(\d{1,2}\.?\d*)%").unwrap());
 
     if let Some(m) = bracketed_pct.find(&clean) {
         // Found bracketed percentage - use it